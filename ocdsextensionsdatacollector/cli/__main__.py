@@ -9,8 +9,10 @@ logger = logging.getLogger('ocdsextensionsdatacollector')
 
 COMMAND_MODULES = (
     'ocdsextensionsdatacollector.cli.commands.download',
+    'ocdsextensionsdatacollector.cli.commands.export_sqlite',
     'ocdsextensionsdatacollector.cli.commands.generate_data_file',
     'ocdsextensionsdatacollector.cli.commands.generate_pot_files',
+    'ocdsextensionsdatacollector.cli.commands.merge',
 )
 
 
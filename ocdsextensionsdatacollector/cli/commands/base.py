@@ -1,3 +1,5 @@
+import argparse
+import hashlib
 from collections import defaultdict
 
 from ocdsextensionregistry import ExtensionRegistry
@@ -5,6 +7,41 @@ from ocdsextensionregistry import ExtensionRegistry
 from ocdsextensionsdatacollector.exceptions import CommandError
 
 
+def shard(value):
+    """
+    Parses a shard specification like '1/4' into a tuple of a 1-based index and a count.
+    """
+    try:
+        index, count = map(int, value.split('/', 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Couldn't parse '{}'. Use 'I/N', e.g. '1/4'.".format(value))
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("Couldn't parse '{}'. I must be between 1 and N.".format(value))
+    return index, count
+
+
+def positive_integer(value):
+    """
+    Parses an integer that must be at least 1.
+    """
+    try:
+        integer = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Couldn't parse '{}'. Use an integer.".format(value))
+    if integer < 1:
+        raise argparse.ArgumentTypeError("Couldn't parse '{}'. Use an integer greater than 0.".format(value))
+    return integer
+
+
+def in_shard(extension_id, index, count):
+    """
+    Returns whether the extension belongs to the shard. All versions of an extension belong to the same shard.
+    """
+    # Python's hash() is salted per process, so use a digest for a partition that is stable across machines.
+    digest = hashlib.md5(extension_id.encode('utf-8')).hexdigest()
+    return int(digest, 16) % count == index - 1
+
+
 class BaseCommand:
     def __init__(self, subparsers):
         """
@@ -25,8 +62,18 @@ class BaseCommand:
     def handle(self):
         raise NotImplementedError('commands must implement handle()')
 
+    def add_shard_argument(self):
+        """
+        Adds the --shard argument to the subparser.
+        """
+        self.add_argument('--shard', type=shard, metavar='I/N',
+                          help="process only the I'th of N partitions of extensions (e.g. '1/4')")
+
+    def registry(self):
+        return ExtensionRegistry(self.args.extension_versions_url, self.args.extensions_url)
+
     def versions(self):
-        registry = ExtensionRegistry(self.args.extension_versions_url, self.args.extensions_url)
+        registry = self.registry()
 
         versions = defaultdict(list)
         for value in self.args.versions:
@@ -39,6 +86,10 @@ class BaseCommand:
             else:
                 versions[value]
 
+        shard = getattr(self.args, 'shard', None)
+
         for version in registry:
+            if shard and not in_shard(version.id, *shard):
+                continue
             if (not self.args.versions or version.id in versions) and (not versions[version.id] or version.version in versions[version.id]):  # noqa
                 yield version
@@ -0,0 +1,205 @@
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from tempfile import mkstemp
+
+from .base import BaseCommand, positive_integer
+from .generate_data_file import get_latest_version, get_version_data
+from ocdsextensionsdatacollector import EXTENSIONS_DATA, EXTENSION_VERSIONS_DATA
+from ocdsextensionsdatacollector.exceptions import CommandError
+
+SCHEMA = """
+CREATE TABLE extensions (
+    id TEXT PRIMARY KEY,
+    category TEXT,
+    core INTEGER,
+    name TEXT,
+    description TEXT,
+    latest_version TEXT
+);
+CREATE TABLE versions (
+    extension_id TEXT REFERENCES extensions (id),
+    version TEXT,
+    date TEXT,
+    base_url TEXT,
+    download_url TEXT,
+    metadata TEXT,
+    PRIMARY KEY (extension_id, version)
+);
+CREATE TABLE codelist_rows (
+    extension_id TEXT,
+    version TEXT,
+    codelist TEXT,
+    language TEXT,
+    code TEXT,
+    row TEXT
+);
+CREATE INDEX codelist_rows_code ON codelist_rows (code);
+CREATE TABLE schema_paths (
+    extension_id TEXT,
+    version TEXT,
+    schema TEXT,
+    language TEXT,
+    pointer TEXT,
+    name TEXT
+);
+CREATE INDEX schema_paths_name ON schema_paths (name);
+CREATE VIRTUAL TABLE docs USING fts5 (
+    extension_id UNINDEXED,
+    version UNINDEXED,
+    language UNINDEXED,
+    name UNINDEXED,
+    content
+);
+CREATE VIRTUAL TABLE readmes USING fts5 (
+    extension_id UNINDEXED,
+    version UNINDEXED,
+    language UNINDEXED,
+    content
+);
+"""
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def schema_paths(value, pointer=''):
+    """
+    Yields the JSON Pointer and name of each field and definition in a JSON Schema.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            item_pointer = '{}/{}'.format(pointer, escape(key))
+            # Only the values of these keywords map names to subschemas.
+            if key in ('properties', 'definitions', 'patternProperties') and isinstance(item, dict):
+                for name, subschema in item.items():
+                    subschema_pointer = '{}/{}'.format(item_pointer, escape(name))
+                    if isinstance(subschema, dict):
+                        yield subschema_pointer, name
+                    yield from schema_paths(subschema, subschema_pointer)
+            else:
+                yield from schema_paths(item, item_pointer)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from schema_paths(item, '{}/{}'.format(pointer, index))
+
+
+def escape(token):
+    """
+    Escapes a reference token in a JSON Pointer.
+    """
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+class Command(BaseCommand):
+    name = 'export-sqlite'
+    help = 'exports all the information about versions of extensions to a SQLite database with full-text indexes'
+
+    def add_arguments(self):
+        self.add_argument('output_file',
+                          help='the SQLite database file in which to write the output')
+        self.add_argument('versions', nargs='*',
+                          help="the versions of extensions to process (e.g. 'bids' or 'lots==master')")
+        self.add_argument('--batch-size', type=positive_integer, default=50,
+                          help='the number of versions to write per transaction')
+        self.add_argument('--extensions-url', default=EXTENSIONS_DATA,
+                          help="the URL of the registry's extensions.csv")
+        self.add_argument('--extension-versions-url', default=EXTENSION_VERSIONS_DATA,
+                          help="the URL of the registry's extension_versions.csv")
+
+    def handle(self):
+        output_file = Path(self.args.output_file)
+        if output_file.exists():
+            raise CommandError('File {} already exists!'.format(output_file))
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file, so that a failed export doesn't leave an incomplete database.
+        fd, temporary_file = mkstemp(suffix='.sqlite', prefix='.', dir=str(output_file.parent))
+        os.close(fd)
+
+        # mkstemp() creates the file with mode 0600. Apply the umask's permissions instead, like other commands.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary_file, 0o666 & ~umask)
+
+        try:
+            connection = sqlite3.connect(temporary_file)
+            try:
+                self.export(connection)
+            finally:
+                connection.close()
+
+            # Unlike os.rename(), os.link() never replaces a file created since the check above.
+            try:
+                os.link(temporary_file, str(output_file))
+            except FileExistsError:
+                raise CommandError('File {} already exists!'.format(output_file))
+        finally:
+            os.unlink(temporary_file)
+
+    def export(self, connection):
+        connection.executescript(SCHEMA)
+
+        # The latest version is determined once all versions of an extension are written.
+        extensions = OrderedDict()
+
+        for count, version in enumerate(self.versions(), 1):
+            if version.id not in extensions:
+                extensions[version.id] = OrderedDict()
+                connection.execute('INSERT INTO extensions (id, category, core) VALUES (?, ?, ?)',
+                                   (version.id, version.category, version.core))
+
+            version_data = get_version_data(version)
+            extensions[version.id][version.version] = OrderedDict([
+                ('date', version_data['date']),
+                ('metadata', version_data['metadata']),
+            ])
+            self.insert_version(connection, version_data)
+
+            if count % self.args.batch_size == 0:
+                connection.commit()
+
+        for _id, versions in extensions.items():
+            latest_version = get_latest_version(_id, versions)
+            metadata = versions[latest_version]['metadata']
+            connection.execute('UPDATE extensions SET name = ?, description = ?, latest_version = ? WHERE id = ?',
+                               (dumps(metadata['name']), dumps(metadata['description']), latest_version, _id))
+
+        connection.commit()
+
+    def insert_version(self, connection, version_data):
+        key = (version_data['id'], version_data['version'])
+
+        connection.execute('INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?)',
+                           key + (version_data['date'], version_data['base_url'], version_data['download_url'],
+                                  dumps(version_data['metadata'])))
+
+        connection.executemany('INSERT INTO codelist_rows VALUES (?, ?, ?, ?, ?, ?)', [
+            key + (name, language, code, dumps(value))
+            for name, codelist in version_data['codelists'].items()
+            for code, row in codelist['rows'].items()
+            for language, value in row.items()
+        ])
+
+        connection.executemany('INSERT INTO schema_paths VALUES (?, ?, ?, ?, ?, ?)', [
+            key + (name, language) + path
+            for name, languages in version_data['schemas'].items()
+            for language, schema in languages.items()
+            for path in schema_paths(schema)
+        ])
+
+        connection.executemany('INSERT INTO docs VALUES (?, ?, ?, ?, ?)', [
+            key + (language, name, content)
+            for name, languages in version_data['docs'].items()
+            for language, content in languages.items()
+        ])
+
+        connection.executemany('INSERT INTO readmes VALUES (?, ?, ?, ?)', [
+            key + (language, content)
+            for language, content in version_data['readme'].items()
+            if content is not None
+        ])
@@ -7,6 +7,75 @@ from ocdsextensionsdatacollector import EXTENSIONS_DATA, EXTENSION_VERSIONS_DATA
 from ocdsextensionsdatacollector.exceptions import CommandError
 
 
+def get_version_data(version):
+    """
+    Returns the data about a version of an extension, as it appears in the data file.
+    """
+    # Add the version's metadata.
+    version_data = OrderedDict([
+        ('id', version.id),
+        ('date', version.date),
+        ('version', version.version),
+        ('base_url', version.base_url),
+        ('download_url', version.download_url),
+        ('metadata', version.metadata),
+        ('schemas', OrderedDict()),
+        ('codelists', OrderedDict()),
+        ('docs', OrderedDict()),
+        ('readme', OrderedDict({
+            'en': version.remote('README.md'),
+        })),
+    ])
+
+    # Add the version's schema.
+    for name in ('record-package-schema.json', 'release-package-schema.json', 'release-schema.json'):
+        if name in version.schemas:
+            version_data['schemas'][name] = OrderedDict({
+                'en': version.schemas[name],
+            })
+        else:
+            version_data['schemas'][name] = {}
+
+    # Add the version's codelists.
+    for name in sorted(version.codelists):
+        version_data['codelists'][name] = OrderedDict([
+            ('fieldnames', OrderedDict()),
+            ('rows', OrderedDict()),
+        ])
+
+        codelist = version.codelists[name]
+        for fieldname in codelist.fieldnames:
+            version_data['codelists'][name]['fieldnames'][fieldname] = OrderedDict({
+                'en': fieldname,
+            })
+        for row in codelist.rows:
+            version_data['codelists'][name]['rows'][row['Code']] = OrderedDict({
+                'en': OrderedDict(row),
+            })
+
+    # Add the version's documentation.
+    for name in sorted(version.docs):
+        version_data['docs'][name] = OrderedDict({
+            'en': version.docs[name],
+        })
+
+    return version_data
+
+
+def get_latest_version(_id, versions):
+    """
+    Returns the latest version of an extension, given a dict of its versions' data.
+    """
+    if 'master' in versions:
+        return 'master'
+
+    dated = list(filter(lambda item: item[1]['date'], versions.items()))
+    if dated:
+        return sorted(dated, key=lambda item: item[1]['date'])[-1][0]
+
+    raise CommandError("Couldn't determine latest version of {}".format(_id))
+
+
 class Command(BaseCommand):
     name = 'generate-data-file'
     help = 'generates a data file in JSON format with all the information about versions of extensions'
@@ -18,6 +87,7 @@ class Command(BaseCommand):
                           default=EXTENSIONS_DATA)
         self.add_argument('--extension-versions-url', help="the URL of the registry's extension_versions.csv",
                           default=EXTENSION_VERSIONS_DATA)
+        self.add_shard_argument()
 
     def handle(self):
         data = OrderedDict()
@@ -35,67 +105,10 @@ class Command(BaseCommand):
                     ('versions', OrderedDict()),
                 ])
 
-            # Add the version's metadata.
-            version_data = OrderedDict([
-                ('id', version.id),
-                ('date', version.date),
-                ('version', version.version),
-                ('base_url', version.base_url),
-                ('download_url', version.download_url),
-                ('metadata', version.metadata),
-                ('schemas', OrderedDict()),
-                ('codelists', OrderedDict()),
-                ('docs', OrderedDict()),
-                ('readme', OrderedDict({
-                    'en': version.remote('README.md'),
-                })),
-            ])
-
-            # Add the version's schema.
-            for name in ('record-package-schema.json', 'release-package-schema.json', 'release-schema.json'):
-                if name in version.schemas:
-                    version_data['schemas'][name] = OrderedDict({
-                        'en': version.schemas[name],
-                    })
-                else:
-                    version_data['schemas'][name] = {}
-
-            # Add the version's codelists.
-            for name in sorted(version.codelists):
-                version_data['codelists'][name] = OrderedDict([
-                    ('fieldnames', OrderedDict()),
-                    ('rows', OrderedDict()),
-                ])
-
-                codelist = version.codelists[name]
-                for fieldname in codelist.fieldnames:
-                    version_data['codelists'][name]['fieldnames'][fieldname] = OrderedDict({
-                        'en': fieldname,
-                    })
-                for row in codelist.rows:
-                    version_data['codelists'][name]['rows'][row['Code']] = OrderedDict({
-                        'en': OrderedDict(row),
-                    })
-
-            # Add the version's documentation.
-            for name in sorted(version.docs):
-                version_data['docs'][name] = OrderedDict({
-                    'en': version.docs[name],
-                })
-
-            data[version.id]['versions'][version.version] = version_data
+            data[version.id]['versions'][version.version] = get_version_data(version)
 
         for _id in data:
-            # Determine the latest version.
-            versions = data[_id]['versions']
-            if 'master' in versions:
-                latest_version = 'master'
-            else:
-                dated = list(filter(lambda item: item[1]['date'], versions.items()))
-                if dated:
-                    latest_version = sorted(dated, key=lambda item: item[1]['date'])[-1][0]
-                else:
-                    raise CommandError("Couldn't determine latest version of {}".format(_id))
+            latest_version = get_latest_version(_id, data[_id]['versions'])
 
             # Apply the latest version.
             data[_id]['latest_version'] = latest_version
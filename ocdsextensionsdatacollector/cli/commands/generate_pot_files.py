@@ -37,6 +37,7 @@ class Command(BaseCommand):
                           help="the URL of the registry's extensions.csv")
         self.add_argument('--extension-versions-url', default=EXTENSION_VERSIONS_DATA,
                           help="the URL of the registry's extension_versions.csv")
+        self.add_shard_argument()
 
     def handle(self):
         output_directory = Path(self.args.output_directory)
@@ -0,0 +1,88 @@
+import json
+import logging
+import shutil
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+from .base import BaseCommand
+from ocdsextensionsdatacollector import EXTENSIONS_DATA, EXTENSION_VERSIONS_DATA
+from ocdsextensionsdatacollector.exceptions import CommandError
+
+logger = logging.getLogger('ocdsextensionsdatacollector')
+
+
+class Command(BaseCommand):
+    name = 'merge'
+    help = 'merges the outputs of sharded runs of the generate-data-file or generate-pot-files commands'
+
+    def add_arguments(self):
+        self.add_argument('kind', choices=['data-file', 'pot-files'],
+                          help='the kind of output to merge')
+        self.add_argument('inputs', nargs='+',
+                          help='the data files or POT directories to merge')
+        self.add_argument('-o', '--output-directory',
+                          help='the directory in which to write the merged POT files')
+        self.add_argument('--extensions-url', default=EXTENSIONS_DATA,
+                          help="the URL of the registry's extensions.csv")
+        self.add_argument('--extension-versions-url', default=EXTENSION_VERSIONS_DATA,
+                          help="the URL of the registry's extension_versions.csv")
+
+    def handle(self):
+        if self.args.kind == 'data-file':
+            self.merge_data_files()
+        else:
+            self.merge_pot_files()
+
+    def merge_data_files(self):
+        shards = OrderedDict()
+
+        for filename in self.args.inputs:
+            with open(filename, encoding='utf-8') as f:
+                for _id, value in json.load(f, object_pairs_hook=OrderedDict).items():
+                    if _id in shards:
+                        raise CommandError('Extension {} is in more than one input. Are the shards distinct?'
+                                           .format(_id))
+                    shards[_id] = value
+
+        # Order the extensions as an unsharded run would, i.e. by the first registry row of a version in the output.
+        data = OrderedDict()
+        for version in self.registry():
+            if version.id in shards and version.id not in data and version.version in shards[version.id]['versions']:
+                data[version.id] = shards[version.id]
+
+        missing = set(shards) - set(data)
+        if missing:
+            raise CommandError('Extensions {} are not in the registry.'.format(', '.join(sorted(missing))))
+
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2, separators=(',', ': '))
+
+    def merge_pot_files(self):
+        if not self.args.output_directory:
+            raise CommandError('Set the --output-directory option to merge POT files.')
+
+        output_directory = Path(self.args.output_directory)
+        if output_directory.is_dir() and any(output_directory.iterdir()):
+            raise CommandError('Directory {} is not empty!'.format(output_directory))
+
+        # POT files are organized like `{extension}/{version}/{files}`, and each extension is in only one shard.
+        seen = set()
+        for input_directory in map(Path, self.args.inputs):
+            # A shard without any extensions writes no output directory.
+            if not input_directory.is_dir():
+                logger.warning('No directory {}'.format(input_directory))
+                continue
+
+            for extension_directory in sorted(input_directory.iterdir()):
+                if not extension_directory.is_dir():
+                    continue
+                if extension_directory.name in seen:
+                    raise CommandError('Extension {} is in more than one input. Are the shards distinct?'
+                                       .format(extension_directory.name))
+                seen.add(extension_directory.name)
+
+                for path in sorted(extension_directory.glob('**/*')):
+                    if path.is_file():
+                        destination = output_directory / path.relative_to(input_directory)
+                        destination.parent.mkdir(parents=True, exist_ok=True)
+                        shutil.copyfile(str(path), str(destination))
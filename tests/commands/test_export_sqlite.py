@@ -0,0 +1,189 @@
+import logging
+import os
+import sqlite3
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from ocdsextensionregistry import ExtensionRegistry
+
+from ocdsextensionsdatacollector import EXTENSIONS_DATA, EXTENSION_VERSIONS_DATA
+from ocdsextensionsdatacollector.cli.__main__ import main
+from ocdsextensionsdatacollector.cli.commands.base import BaseCommand
+from ocdsextensionsdatacollector.cli.commands import export_sqlite
+from ocdsextensionsdatacollector.exceptions import CommandError
+
+args = ['ocdsextensionsdatacollector', 'export-sqlite']
+
+
+def test_command(monkeypatch, tmpdir):
+    filename = str(tmpdir / 'data.sqlite')
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', args + [filename, 'location==v1.1.3'])
+        main()
+
+    assert actual.getvalue() == ''
+
+    connection = sqlite3.connect(filename)
+
+    assert connection.execute('SELECT id, category, core, name, latest_version FROM extensions').fetchall() == [
+        ('location', 'item', 1, '{"en": "Location"}', 'v1.1.3'),
+    ]
+    assert connection.execute('SELECT extension_id, version FROM versions').fetchall() == [
+        ('location', 'v1.1.3'),
+    ]
+    assert connection.execute("SELECT codelist FROM codelist_rows WHERE code = 'Point'").fetchall() == [
+        ('geometryType.csv',),
+    ]
+    assert connection.execute("SELECT pointer FROM schema_paths WHERE name = 'gazetteer'").fetchall() == [
+        ('/definitions/Location/properties/gazetteer',),
+    ]
+    assert connection.execute("SELECT count(*) FROM readmes WHERE readmes MATCH 'gazetteer'").fetchone() == (1,)
+
+
+def test_command_batch_size(monkeypatch, tmpdir):
+    filename = str(tmpdir / 'data.sqlite')
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', args + [filename, 'location', '--batch-size', '1'])
+        main()
+
+    assert actual.getvalue() == ''
+
+    expected = [version.version for version in ExtensionRegistry(EXTENSION_VERSIONS_DATA, EXTENSIONS_DATA)
+                if version.id == 'location']
+
+    connection = sqlite3.connect(filename)
+
+    assert len(expected) > 1
+    assert connection.execute("SELECT version FROM versions WHERE extension_id = 'location'").fetchall() == [
+        (version,) for version in expected
+    ]
+    assert connection.execute('SELECT latest_version FROM extensions').fetchall() == [('master',)]
+
+
+def test_command_mode(monkeypatch, tmpdir):
+    filename = str(tmpdir / 'data.sqlite')
+    monkeypatch.setattr(BaseCommand, 'versions', lambda self: iter([]))
+
+    umask = os.umask(0o022)
+    try:
+        monkeypatch.setattr(sys, 'argv', args + [filename])
+        main()
+    finally:
+        os.umask(umask)
+
+    assert os.stat(filename).st_mode & 0o777 == 0o644
+
+
+def test_command_parent(monkeypatch, tmpdir):
+    filename = str(tmpdir / 'build' / 'data.sqlite')
+    monkeypatch.setattr(BaseCommand, 'versions', lambda self: iter([]))
+
+    monkeypatch.setattr(sys, 'argv', args + [filename])
+    main()
+
+    assert os.path.isfile(filename)
+    assert tmpdir.join('build').listdir() == [tmpdir / 'build' / 'data.sqlite']
+
+
+# Never overwrite a file created during the export.
+def test_command_created(monkeypatch, tmpdir, caplog):
+    filename = str(tmpdir / 'data.sqlite')
+
+    def versions(self):
+        with open(filename, 'w') as f:
+            f.write('original')
+        return iter([])
+
+    monkeypatch.setattr(BaseCommand, 'versions', versions)
+
+    with pytest.raises(SystemExit) as excinfo:
+        monkeypatch.setattr(sys, 'argv', args + [filename])
+        main()
+
+    assert caplog.records[-1].levelname == 'CRITICAL'
+    assert caplog.records[-1].message.endswith('already exists!')
+    assert excinfo.value.code == 1
+
+    assert tmpdir.listdir() == [tmpdir / 'data.sqlite']
+    assert tmpdir.join('data.sqlite').read() == 'original'
+
+
+def test_command_repeated(monkeypatch, tmpdir, caplog):
+    caplog.set_level(logging.INFO)  # silence connectionpool.py DEBUG messages
+    argv = args + [str(tmpdir / 'data.sqlite'), 'location==v1.1.3']
+
+    monkeypatch.setattr(sys, 'argv', argv)
+    main()
+
+    with pytest.raises(SystemExit) as excinfo:
+        monkeypatch.setattr(sys, 'argv', argv)
+        main()
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelname == 'CRITICAL'
+    assert caplog.records[0].message.endswith('already exists!')
+    assert excinfo.value.code == 1
+
+
+# Don't leave an incomplete database.
+def test_command_error(monkeypatch, tmpdir, caplog):
+    caplog.set_level(logging.INFO)  # silence connectionpool.py DEBUG messages
+
+    def get_version_data(version):
+        raise CommandError('error')
+
+    monkeypatch.setattr(export_sqlite, 'get_version_data', get_version_data)
+
+    with pytest.raises(SystemExit) as excinfo:
+        monkeypatch.setattr(sys, 'argv', args + [str(tmpdir / 'data.sqlite'), 'location==v1.1.3'])
+        main()
+
+    assert excinfo.value.code == 1
+
+    assert tmpdir.listdir() == []
+
+
+@pytest.mark.parametrize('batch_size', ['0', '-1', 'x'])
+def test_command_batch_size_invalid(monkeypatch, tmpdir, batch_size):
+    with pytest.raises(SystemExit) as excinfo:
+        monkeypatch.setattr(sys, 'argv', args + [str(tmpdir / 'data.sqlite'), '--batch-size', batch_size])
+        main()
+
+    assert excinfo.value.code == 2
+
+    assert tmpdir.listdir() == []
+
+
+def test_schema_paths():
+    schema = {
+        'definitions': {
+            'Location': {
+                'type': 'object',
+                'properties': {
+                    'definitions': {
+                        'type': 'string',
+                        'description': 'A field named like a keyword.',
+                    },
+                    'properties': {
+                        'type': 'object',
+                        'properties': {
+                            'a/b': {
+                                'type': 'string',
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+    assert list(export_sqlite.schema_paths(schema)) == [
+        ('/definitions/Location', 'Location'),
+        ('/definitions/Location/properties/definitions', 'definitions'),
+        ('/definitions/Location/properties/properties', 'properties'),
+        ('/definitions/Location/properties/properties/properties/a~1b', 'a/b'),
+    ]
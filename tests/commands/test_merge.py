@@ -0,0 +1,158 @@
+import filecmp
+import json
+import logging
+import os
+import sys
+from collections import OrderedDict, namedtuple
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from ocdsextensionsdatacollector.cli.__main__ import main
+from ocdsextensionsdatacollector.cli.commands.base import BaseCommand
+from tests import read
+
+args = ['ocdsextensionsdatacollector', 'merge']
+
+
+def test_command_data_file(monkeypatch, tmpdir):
+    filenames = []
+    for shard in ('1/2', '2/2'):
+        with patch('sys.stdout', new_callable=StringIO) as actual:
+            monkeypatch.setattr(sys, 'argv', ['ocdsextensionsdatacollector', 'generate-data-file',
+                                              'location==v1.1.3', 'lots==v1.1.3', '--shard', shard])
+            main()
+
+        filename = str(tmpdir / '{}.json'.format(shard.replace('/', '-')))
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(actual.getvalue())
+        filenames.append(filename)
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', ['ocdsextensionsdatacollector', 'generate-data-file',
+                                          'location==v1.1.3', 'lots==v1.1.3'])
+        main()
+
+    expected = actual.getvalue()
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', args + ['data-file'] + filenames)
+        main()
+
+    assert actual.getvalue() == expected
+
+
+# Order the extensions by the first registry row of a version in the output, not of any version.
+def test_command_data_file_order(monkeypatch, tmpdir):
+    Version = namedtuple('Version', ['id', 'version'])
+    registry = [Version('location', 'v1.1.1'), Version('lots', 'v1.1.3'), Version('location', 'v1.1.3')]
+    monkeypatch.setattr(BaseCommand, 'registry', lambda self: registry)
+
+    shards = [
+        OrderedDict([('location', OrderedDict([('versions', OrderedDict([('v1.1.3', {})]))]))]),
+        OrderedDict([('lots', OrderedDict([('versions', OrderedDict([('v1.1.3', {})]))]))]),
+    ]
+
+    filenames = []
+    for index, shard in enumerate(shards):
+        filename = str(tmpdir / '{}.json'.format(index))
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(shard, f)
+        filenames.append(filename)
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', args + ['data-file'] + filenames)
+        main()
+
+    assert list(json.loads(actual.getvalue(), object_pairs_hook=OrderedDict)) == ['lots', 'location']
+
+
+def test_command_data_file_single(monkeypatch, tmpdir):
+    filename = str(tmpdir / 'data.json')
+    with open(filename, 'w') as f:
+        f.write(read('location-v1.1.3.json'))
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', args + ['data-file', filename])
+        main()
+
+    assert actual.getvalue() == read('location-v1.1.3.json')
+
+
+def test_command_data_file_overlap(monkeypatch, tmpdir, caplog):
+    caplog.set_level(logging.INFO)  # silence connectionpool.py DEBUG messages
+
+    filename = str(tmpdir / 'data.json')
+    with open(filename, 'w') as f:
+        f.write(read('location-v1.1.3.json'))
+
+    with pytest.raises(SystemExit) as excinfo:
+        with patch('sys.stdout', new_callable=StringIO) as actual:
+            monkeypatch.setattr(sys, 'argv', args + ['data-file', filename, filename])
+            main()
+
+    assert actual.getvalue() == ''
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelname == 'CRITICAL'
+    assert caplog.records[0].message == 'Extension location is in more than one input. Are the shards distinct?'
+    assert excinfo.value.code == 1
+
+
+def test_command_pot_files(monkeypatch, tmpdir):
+    for shard in ('1/2', '2/2'):
+        monkeypatch.setattr(sys, 'argv', ['ocdsextensionsdatacollector', 'generate-pot-files',
+                                          str(tmpdir / 'shard-{}'.format(shard.replace('/', '-'))),
+                                          'location==v1.1.3', 'lots==v1.1.3', '--shard', shard])
+        main()
+
+    with patch('sys.stdout', new_callable=StringIO) as actual:
+        monkeypatch.setattr(sys, 'argv', args + ['pot-files', str(tmpdir / 'shard-1-2'), str(tmpdir / 'shard-2-2'),
+                                                 '--output-directory', str(tmpdir / 'merged')])
+        main()
+
+    assert actual.getvalue() == ''
+
+    tree = list(os.walk(tmpdir / 'merged'))
+
+    # extensions
+    assert sorted(tree[0][1]) == ['location', 'lots']
+    for extension in ('location', 'lots'):
+        shard = 'shard-1-2' if (tmpdir / 'shard-1-2' / extension).exists() else 'shard-2-2'
+        comparison = filecmp.dircmp(str(tmpdir / shard / extension / 'v1.1.3'),
+                                    str(tmpdir / 'merged' / extension / 'v1.1.3'))
+        assert comparison.left_only == []
+        assert comparison.right_only == []
+        assert comparison.diff_files == []
+
+
+# Require the user to decide what to overwrite.
+def test_command_pot_files_not_empty(monkeypatch, tmpdir, caplog):
+    caplog.set_level(logging.INFO)  # silence connectionpool.py DEBUG messages
+
+    (tmpdir / 'shard' / 'location' / 'v1.1.3').ensure('docs.pot')
+    (tmpdir / 'merged').ensure('stale.pot')
+
+    with pytest.raises(SystemExit) as excinfo:
+        with patch('sys.stdout', new_callable=StringIO) as actual:
+            monkeypatch.setattr(sys, 'argv', args + ['pot-files', str(tmpdir / 'shard'),
+                                                     '--output-directory', str(tmpdir / 'merged')])
+            main()
+
+    assert actual.getvalue() == ''
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelname == 'CRITICAL'
+    assert caplog.records[0].message.endswith('is not empty!')
+    assert excinfo.value.code == 1
+
+    assert not (tmpdir / 'merged' / 'location').exists()
+
+
+def test_command_shard_invalid(monkeypatch):
+    with pytest.raises(SystemExit) as excinfo:
+        monkeypatch.setattr(sys, 'argv', ['ocdsextensionsdatacollector', 'generate-data-file', '--shard', '3/2'])
+        main()
+
+    assert excinfo.value.code == 2